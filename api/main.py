@@ -3,20 +3,45 @@ FastAPI wrapper pour l'API Timely.
 Se concentre sur la récupération des événements pour générer des rapports d'activité.
 """
 
-from fastapi import FastAPI, HTTPException
-from typing import List, Dict, Any, Optional
+from fastapi import FastAPI, HTTPException, Request, Response
+from typing import BinaryIO, Deque, Iterator, List, Dict, Any, Optional, Tuple
+import anyio
+import asyncio
+import hashlib
 import httpx
-from pydantic import BaseModel
+import math
+import msgspec
+import orjson
 from dotenv import load_dotenv
 import os
-from io import BytesIO
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
 from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from timely_to_excel import TimelyReport
-from datetime import datetime, timedelta
-import statistics
-from collections import defaultdict
-import holidays
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from timely_to_excel import (
+    ClientDay,
+    TimelyReport,
+    event_client_name,
+    fr_holiday_dates,
+    summarize_day,
+)
+from schemas import (
+    DataAnalysisRequest,
+    LLMAnalysisRequest,
+    LLMAnalysisResponse,
+    LLMInsight,
+    ReportRequest,
+    TimelyEvent,
+)
+from datetime import datetime
+from collections import Counter, defaultdict, deque
+from itertools import chain, pairwise
+from urllib.parse import parse_qs, quote, urlparse
 import json
 
 # Configuration
@@ -28,11 +53,81 @@ TIMELY_EMAIL = os.getenv("TIMELY_EMAIL")
 TIMELY_PASSWORD = os.getenv("TIMELY_PASSWORD")
 TIMELY_ACCOUNT_ID = os.getenv("TIMELY_ACCOUNT_ID")
 API_URL = os.getenv("API_URL")
+EVENTS_PER_PAGE = 250
+TOKEN_EXPIRY_MARGIN = 60  # secondes de marge avant l'expiration du token
+CLIENTS_CACHE_TTL = 300  # secondes
+EVENTS_CACHE_TTL = 60  # secondes
+MAX_CONCURRENT_PAGES = 8
+TIMELY_RATE_LIMIT_RPM = 120  # plafond proactif, les en-têtes de Timely priment
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER = 30  # secondes ; au-delà, le 429 est renvoyé sans attendre
+EXCEL_SPOOL_MAX_SIZE = 2 * 1024 * 1024  # au-delà, le fichier Excel passe sur disque
+EXCEL_CHUNK_SIZE = 64 * 1024
+# La liste des clients change rarement : un CDN peut l'absorber
+CLIENTS_CACHE_CONTROL = "public, max-age=300, s-maxage=600, stale-while-revalidate=60"
+CLIENT_SEPARATOR = "\n\n― ― ― ― ― ― ― ― ― ―\n\n"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ORJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée avec orjson (directement en bytes)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class XlsxPassthroughGZipMiddleware:
+    """GZip qui laisse passer les fichiers Excel tels quels
+
+    Un xlsx est déjà une archive compressée : le regzipper coûte du CPU pour
+    rien et fait perdre le Content-Length (plus de progression côté client).
+    """
+
+    # GZipMiddleware n'accepte pas d'exclure un Content-Type sur toutes les
+    # versions de Starlette couvertes par fastapi>=0.93 : l'application interne
+    # reçoit donc le send d'origine par le scope, seul canal qu'il lui transmet
+    _RAW_SEND = "weekly_ingestor.raw_send"
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500) -> None:
+        self.app = app
+        self.gzip = GZipMiddleware(self._route, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.gzip({**scope, self._RAW_SEND: send}, receive, send)
+
+    async def _route(self, scope: Scope, receive: Receive, gzip_send: Send) -> None:
+        """Aiguille la réponse d'après son Content-Type, avant toute compression"""
+        raw_send = scope.pop(self._RAW_SEND)
+        target = gzip_send
+
+        async def send(message: Message) -> None:
+            nonlocal target
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if content_type.startswith(XLSX_MEDIA_TYPE):
+                    target = raw_send
+            await target(message)
+
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ouvre le client Timely partagé au démarrage et le ferme à l'arrêt"""
+    await timely_client.start()
+    yield
+    await timely_client.aclose()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Timely Events API",
     description="API simplifiée pour récupérer les événements Timely",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configuration CORS
@@ -44,102 +139,419 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression des réponses JSON très répétitives (les fichiers Excel en sont exclus)
+app.add_middleware(XlsxPassthroughGZipMiddleware, minimum_size=1024)
+
+
+# Décodeur ne matérialisant que les champs de TimelyEvent (les autres sont ignorés)
+report_events_decoder = msgspec.json.Decoder(List[TimelyEvent])
+
+
+class RateLimiter:
+    """
+    Limiteur de débit des appels à Timely.
+
+    - proactif : fenêtre glissante de 60 s plafonnée à rpm_limit requêtes ;
+    - réactif : lecture des en-têtes X-RateLimit-* et Retry-After ;
+    - concurrence adaptative (AIMD) : divisée par deux à l'approche de la
+      limite, augmentée de 0,5 après chaque réponse saine.
+    """
+
+    def __init__(self, rpm_limit: int, max_concurrency: int):
+        self.rpm_limit = rpm_limit
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._sent_at: Deque[float] = deque()
+        self._paused_until = 0.0
+        self._slots = asyncio.Condition()
+
+    async def acquire(self):
+        """Attend une place libre puis un créneau dans la fenêtre de débit"""
+        async with self._slots:
+            await self._slots.wait_for(
+                lambda: self._in_flight < max(1, int(self.concurrency))
+            )
+            self._in_flight += 1
+        try:
+            await self.wait_if_throttled()
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self, response: Optional[httpx.Response] = None):
+        """Libère la place et ajuste le débit d'après la réponse reçue"""
+        if response is not None:
+            self.update_from_headers(response)
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    async def wait_if_throttled(self):
+        while True:
+            now = time.monotonic()
+            while self._sent_at and now - self._sent_at[0] >= 60:
+                self._sent_at.popleft()
+
+            delay = self._paused_until - now
+            if len(self._sent_at) >= self.rpm_limit:
+                delay = max(delay, 60 - (now - self._sent_at[0]))
+            if delay <= 0:
+                self._sent_at.append(now)
+                return
+            await asyncio.sleep(delay)
+
+    def pause(self, delay: float):
+        """Suspend les envois pendant delay secondes"""
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def update_from_headers(self, response: httpx.Response):
+        remaining = _int_header(response, "X-RateLimit-Remaining")
+        limit = _int_header(response, "X-RateLimit-Limit")
+
+        if response.status_code == 429 or (
+            remaining is not None and limit and remaining < limit * 0.1
+        ):
+            # Diminution multiplicative à l'approche de la limite
+            self.concurrency = max(1.0, self.concurrency / 2)
+        elif response.is_success:
+            # Augmentation additive tant que tout va bien
+            self.concurrency = min(self.max_concurrency, self.concurrency + 0.5)
+
 
 class TimelyClient:
     """Client pour interagir avec l'API Timely"""
 
     def __init__(self):
         self.access_token = None
+        self._token_expiry = 0.0
+        self._auth_lock = asyncio.Lock()
+        self._clients_cache: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._clients_lock = asyncio.Lock()
+        self._events_cache: Dict[Tuple[str, str, str], Tuple[float, List]] = {}
+        self._events_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._rate_limiter = RateLimiter(TIMELY_RATE_LIMIT_RPM, MAX_CONCURRENT_PAGES)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Ouvre le client HTTP partagé (pool de connexions keep-alive)"""
+        if self._client is None:
+            # HTTP/2 (négocié via ALPN) multiplexe les pages récupérées en
+            # parallèle sur une seule connexion ; repli HTTP/1.1 sinon
+            self._client = httpx.AsyncClient(
+                base_url=TIMELY_BASE_URL,
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+
+    async def aclose(self):
+        """Ferme le client HTTP partagé"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _has_valid_token(self) -> bool:
+        return bool(self.access_token) and time.monotonic() < self._token_expiry
 
     async def ensure_auth(self):
         """S'assure qu'un token valide est disponible"""
-        if not self.access_token:
-            await self.authenticate()
+        if self._has_valid_token():
+            return
+        # Un seul renouvellement pour toutes les requêtes concurrentes
+        async with self._auth_lock:
+            if not self._has_valid_token():
+                await self.authenticate()
 
     async def authenticate(self):
         """Authentification auprès de l'API Timely"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{TIMELY_BASE_URL}/oauth/token",
-                data={
-                    "grant_type": "password",
-                    "username": TIMELY_EMAIL,
-                    "password": TIMELY_PASSWORD,
-                    "client_id": OAUTH_CLIENT_ID,
-                    "client_secret": OAUTH_CLIENT_SECRET,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+        await self.start()
+        response = await self._client.post(
+            "/oauth/token",
+            data={
+                "grant_type": "password",
+                "username": TIMELY_EMAIL,
+                "password": TIMELY_PASSWORD,
+                "client_id": OAUTH_CLIENT_ID,
+                "client_secret": OAUTH_CLIENT_SECRET,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+        if response.status_code == 200:
+            token = orjson.loads(response.content)
+            self.access_token = token["access_token"]
+            expires_in = token.get("expires_in")
+            self._token_expiry = (
+                time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN
+                if expires_in
+                else float("inf")
+            )
+            self._client.headers["Authorization"] = f"Bearer {self.access_token}"
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail="Échec de l'authentification Timely",
             )
 
-            if response.status_code == 200:
-                self.access_token = response.json()["access_token"]
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Échec de l'authentification Timely",
-                )
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """GET authentifié ; un token refusé (401) est renouvelé une fois"""
+        await self.ensure_auth()
+        token = self.access_token
+        response = await self._client.get(url, **kwargs)
+        if response.status_code == 401:
+            # Révoqué ou expiré plus tôt qu'annoncé. Les requêtes concurrentes
+            # refusées avec le même token ne déclenchent qu'un renouvellement
+            if self.access_token == token:
+                self._token_expiry = 0.0
+            await self.ensure_auth()
+            response = await self._client.get(url, **kwargs)
+        return response
+
+    def _cached_clients(self, account_id: str) -> Optional[List[Dict]]:
+        cached = self._clients_cache.get(account_id)
+        if cached and time.monotonic() - cached[0] < CLIENTS_CACHE_TTL:
+            return cached[1]
+        return None
 
     async def get_clients(self, account_id: str) -> List[Dict]:
-        """Récupère la liste des clients depuis l'API Timely"""
-        await self.ensure_auth()
+        """Récupère la liste des clients depuis l'API Timely (mise en cache courte)"""
+        clients = self._cached_clients(account_id)
+        if clients is not None:
+            return clients
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{TIMELY_BASE_URL}/{account_id}/clients",
-                headers={"Authorization": f"Bearer {self.access_token}"},
-            )
+        # Les requêtes concurrentes partagent un seul appel à Timely
+        async with self._clients_lock:
+            clients = self._cached_clients(account_id)
+            if clients is not None:
+                return clients
 
-            if response.status_code == 200:
-                clients = response.json()
-                return [
-                    client for client in clients if client.get("external_id") is None
-                ]
-            else:
+            response = await self._get(f"/{account_id}/clients")
+
+            if response.status_code != 200:
                 raise HTTPException(
                     status_code=response.status_code,
                     detail=f"Échec de la récupération des clients: {response.text}",
                 )
 
+            clients = [
+                client
+                for client in orjson.loads(response.content)
+                if client.get("external_id") is None
+            ]
+            self._clients_cache[account_id] = (time.monotonic(), clients)
+            return clients
+
+    async def _request_events(
+        self, account_id: str, since: str, upto: str, page: int
+    ) -> httpx.Response:
+        """Effectue la requête d'une page d'événements Timely"""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self._rate_limiter.acquire()
+            response = None
+            try:
+                response = await self._get(
+                    f"/{account_id}/events",
+                    params={
+                        "since": since,
+                        "upto": upto,
+                        "page": page,
+                        "per_page": EVENTS_PER_PAGE,
+                    },
+                )
+            finally:
+                await self._rate_limiter.release(response)
+
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            delay = _retry_after(response, attempt)
+            if delay > MAX_RETRY_AFTER:
+                # La pause bloquerait toutes les requêtes en cours : on abandonne
+                break
+            # Limite de débit atteinte : les envois reprennent après le délai
+            self._rate_limiter.pause(delay)
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail="Erreur lors de la récupération des événements",
+            )
+        return response
+
     async def get_events(
         self, account_id: str, since: str, upto: str, page: int = 1
     ) -> List[Dict]:
         """Récupère les événements Timely pour une période donnée"""
-        await self.ensure_auth()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{TIMELY_BASE_URL}/{account_id}/events",
-                params={"since": since, "upto": upto, "page": page, "per_page": 250},
-                headers={"Authorization": f"Bearer {self.access_token}"},
+        response = await self._request_events(account_id, since, upto, page)
+        return orjson.loads(response.content)
+
+    def _cached_events(self, key: Tuple[str, str, str]) -> Optional[List]:
+        cached = self._events_cache.get(key)
+        if cached and time.monotonic() - cached[0] < EVENTS_CACHE_TTL:
+            return cached[1]
+        return None
+
+    async def get_all_events(
+        self, account_id: str, since: str, upto: str
+    ) -> List[TimelyEvent]:
+        """
+        Récupère tous les événements d'une période (mise en cache courte).
+
+        /analyze-data puis /generate-report sur la même période ne déclenchent
+        ainsi qu'un seul téléchargement. La liste renvoyée est partagée : les
+        appelants ne doivent pas la modifier.
+        """
+        key = (account_id, since, upto)
+        events = self._cached_events(key)
+        if events is not None:
+            return events
+
+        # Les requêtes concurrentes sur la même période partagent un seul appel
+        lock = self._events_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                events = self._cached_events(key)
+                if events is not None:
+                    return events
+
+                events = await self._fetch_all_events(account_id, since, upto)
+                now = time.monotonic()
+                self._events_cache = {
+                    cached_key: cached
+                    for cached_key, cached in self._events_cache.items()
+                    if now - cached[0] < EVENTS_CACHE_TTL
+                }
+                self._events_cache[key] = (now, events)
+                return events
+        finally:
+            if not lock.locked():
+                self._events_locks.pop(key, None)
+
+    async def _fetch_all_events(
+        self, account_id: str, since: str, upto: str
+    ) -> List[TimelyEvent]:
+        """
+        Récupère toutes les pages d'événements pour une période donnée.
+
+        La première page indique le nombre total de pages ; les suivantes sont
+        alors récupérées en parallèle. Seuls les champs de TimelyEvent sont
+        décodés.
+        """
+        response = await self._request_events(account_id, since, upto, 1)
+        first_page = report_events_decoder.decode(response.content)
+        if not first_page:
+            return first_page
+        # Timely peut plafonner per_page : la taille réelle est celle de la 1re page
+        total_pages = _total_pages(response, len(first_page))
+
+        if total_pages is None:
+            # Pas d'information de pagination : on enchaîne jusqu'à une page vide
+            events = list(first_page)
+            last_page, page = first_page, 1
+            while last_page:
+                page += 1
+                last_page = await self._get_page(account_id, since, upto, page)
+                events.extend(last_page)
+            return events
+
+        # La concurrence effective est bornée par le limiteur de débit
+        pages = await asyncio.gather(
+            *(
+                self._get_page(account_id, since, upto, page)
+                for page in range(2, total_pages + 1)
             )
+        )
+        return first_page + list(chain.from_iterable(pages))
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Erreur lors de la récupération des événements",
-                )
+    async def _get_page(
+        self, account_id: str, since: str, upto: str, page: int
+    ) -> List[TimelyEvent]:
+        """Récupère une page d'événements réduits aux champs de TimelyEvent"""
+        response = await self._request_events(account_id, since, upto, page)
+        return report_events_decoder.decode(response.content)
+
+
+def _int_header(response: httpx.Response, name: str) -> Optional[int]:
+    value = response.headers.get(name, "")
+    return int(value) if value.isdigit() else None
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    """Délai avant de réessayer une requête limitée (Retry-After ou backoff exponentiel)"""
+    retry_after = response.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        return float(2**attempt)
+
+
+def _total_pages(response: httpx.Response, page_size: int) -> Optional[int]:
+    """
+    Nombre total de pages annoncé par les en-têtes de pagination, si présent.
+
+    page_size est le nombre d'événements réellement renvoyés par page.
+    """
+    total_pages = response.headers.get("X-Total-Pages")
+    if total_pages and total_pages.isdigit():
+        return int(total_pages)
+
+    total_count = response.headers.get("X-Total-Count")
+    if total_count and total_count.isdigit():
+        return max(1, -(-int(total_count) // page_size))
+
+    last_url = response.links.get("last", {}).get("url")
+    if last_url:
+        last_page = parse_qs(urlparse(last_url).query).get("page", [""])[0]
+        if last_page.isdigit():
+            return int(last_page)
+
+    return None
 
 
 # Initialisation du client Timely
 timely_client = TimelyClient()
 
 
-@app.get("/clients")
-async def list_clients() -> List[Dict[str, Any]]:
+def _if_none_match(request: Request) -> List[str]:
+    """ETags présentés par le client dans l'en-tête If-None-Match"""
+    header = request.headers.get("if-none-match", "")
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def conditional_json_response(
+    request: Request, content: Any, cache_control: str
+) -> Response:
+    """
+    Réponse JSON accompagnée d'un ETag.
+
+    Renvoie un 304 sans corps si le client possède déjà cette version.
+    """
+    response = ORJSONResponse(content=content)
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    client_etags = _if_none_match(request)
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return response
+
+
+@app.get("/clients", response_model=List[Dict[str, Any]])
+async def list_clients(request: Request) -> Response:
     """Récupère la liste des clients disponibles dans Timely"""
     try:
         clients = await timely_client.get_clients(TIMELY_ACCOUNT_ID)
-        return clients
+        return conditional_json_response(request, clients, CLIENTS_CACHE_CONTROL)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/{account_id}/events")
+@app.get("/{account_id}/events", response_model=List[Dict[str, Any]])
 async def list_events(
-    account_id: str, since: str, upto: str, page: int = 1
-) -> List[Dict[str, Any]]:
+    request: Request, account_id: str, since: str, upto: str, page: int = 1
+) -> Response:
     """
     Récupère les événements Timely.
 
@@ -150,58 +562,55 @@ async def list_events(
     """
     try:
         events = await timely_client.get_events(account_id, since, upto, page)
-        return events
+        return conditional_json_response(request, events, "private, max-age=60")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-class ReportRequest(BaseModel):
-    from_date: str
-    to_date: str
-    format: str = "excel"  # "excel" ou "json"
-    client_filter: List[str] | None = None
-
-
-class DataAnalysisRequest(BaseModel):
-    from_date: str
-    to_date: str
-    client_filter: List[str] | None = None
+def validate_period(from_date: str, to_date: str):
+    """Rejette une période invalide avant tout appel à Timely"""
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d")
+        end = datetime.strptime(to_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Dates attendues au format YYYY-MM-DD"
+        )
+    if start > end:
+        raise HTTPException(
+            status_code=400,
+            detail="La date de début doit précéder la date de fin",
+        )
 
 
 @app.post("/analyze-data")
 async def analyze_data(request: DataAnalysisRequest):
     """Analyse intelligente des données pour détecter anomalies et incohérences"""
+    validate_period(request.from_date, request.to_date)
     try:
         report = TimelyReport(TIMELY_ACCOUNT_ID, API_URL)
 
         # Récupérer tous les événements
-        events = await report.get_events(request.from_date, request.to_date)
-
-        # Filtrer pour ne garder que les événements des clients spécifiés
-        filtered_events = (
-            [
-                e
-                for e in events
-                if (
-                    e.get("project", {}).get("client", {}).get("name", "")
-                    in request.client_filter
-                )
-            ]
-            if request.client_filter
-            else events
+        events = await timely_client.get_all_events(
+            TIMELY_ACCOUNT_ID, request.from_date, request.to_date
         )
 
-        # Traiter les événements filtrés
-        data = report.process_events(
-            filtered_events, request.from_date, request.to_date
-        )
-
-        # Analyser les données
-        analysis_result = analyze_data_intelligence(
-            data, request.from_date, request.to_date
+        # Filtrer pour ne garder que les événements des clients spécifiés
+        filtered_events = filter_events(events, request.client_filter)
+
+        # Traitement et analyse sont du pur calcul : hors de la boucle d'événements
+        analysis_result = await anyio.to_thread.run_sync(
+            analyze_events,
+            report,
+            filtered_events,
+            request.from_date,
+            request.to_date,
+            request.include_daily,
         )
 
-        return analysis_result
+        # Sérialisation directe par orjson (ClientDay inclus), sans passer
+        # par jsonable_encoder
+        return ORJSONResponse(content=analysis_result)
 
     except Exception as e:
         raise HTTPException(
@@ -209,21 +618,62 @@ async def analyze_data(request: DataAnalysisRequest):
         )
 
 
+def analyze_events(
+    report: TimelyReport,
+    events: List[Dict],
+    from_date: str,
+    to_date: str,
+    include_daily: bool = False,
+) -> Dict[str, Any]:
+    """Organise les événements par jour puis les analyse (exécuté dans un thread)"""
+    data = report.process_events(events, from_date, to_date)
+    return analyze_data_intelligence(data, from_date, to_date, include_daily)
+
+
+def _mean(values: List[float]) -> float:
+    """Moyenne arithmétique (fsum, sans les fractions exactes de statistics)"""
+    return math.fsum(values) / len(values)
+
+
+def _stdev(values: List[float], mean: float) -> float:
+    """Écart-type d'échantillon autour d'une moyenne déjà calculée"""
+    if len(values) < 2:
+        return 0
+    return math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (len(values) - 1))
+
+
+@dataclass(slots=True)
+class DayWork:
+    """Journée analysée : total d'heures et détail par client"""
+
+    total_hours: float
+    clients: Dict[str, ClientDay]
+    has_off_clients: bool
+
+
 def analyze_data_intelligence(
-    data: Dict[datetime, List], from_date: str, to_date: str
+    data: Dict[datetime, List],
+    from_date: str,
+    to_date: str,
+    include_daily: bool = False,
 ) -> Dict[str, Any]:
-    """Algorithme d'intelligence des données pour détecter anomalies et incohérences"""
+    """
+    Algorithme d'intelligence des données pour détecter anomalies et incohérences.
+
+    Le détail jour par jour (donnees_jour), de loin la plus grosse partie de
+    la réponse, n'est construit que si include_daily est demandé.
+    """
 
     # === ANALYSE STATISTIQUE DES PATTERNS ===
 
     # Calculer les heures par jour (tous clients confondus)
     daily_hours = []
-    daily_work_data = {}
+    daily_work_data: Dict[datetime, DayWork] = {}
 
     for date, entries in data.items():
         if not entries:
             daily_hours.append(0)
-            daily_work_data[date] = {"total_hours": 0, "clients": {}}
+            daily_work_data[date] = DayWork(0, {}, False)
             continue
 
         # Analyser les entrées par client pour ce jour
@@ -231,98 +681,93 @@ def analyze_data_intelligence(
         day_clients = {}
 
         if isinstance(entries[0], tuple):
-            # Grouper par client
-            entries_by_client = defaultdict(list)
-            for prefix, note in entries:
-                client = prefix.strip("[]") if prefix else ""
-                entries_by_client[client].append(note)
-
-            # Calculer les heures par client
-            for client, client_entries in entries_by_client.items():
-                # Vérifier si c'est un jour OFF pour ce client
-                all_off = all(note.strip() == "OFF" for note in client_entries)
-                has_off = any(note.strip() == "OFF" for note in client_entries)
-
-                if all_off:
-                    client_hours = 0
-                elif has_off:
-                    client_hours = 0.5
-                else:
-                    client_hours = 1
-
-                day_clients[client] = {
-                    "hours": client_hours,
-                    "notes": client_entries,
-                    "all_off": all_off,
-                    "has_off": has_off,
-                }
-                day_total_hours += client_hours
+            day_total_hours, day_clients = summarize_day(entries)
 
         daily_hours.append(day_total_hours)
-        daily_work_data[date] = {"total_hours": day_total_hours, "clients": day_clients}
+        daily_work_data[date] = DayWork(
+            day_total_hours,
+            day_clients,
+            any(day.all_off for day in day_clients.values()),
+        )
 
     # Statistiques de base
     work_days = [h for h in daily_hours if h > 0]
     if work_days:
-        avg_hours_per_day = statistics.mean(work_days)
-        std_hours_per_day = statistics.stdev(work_days) if len(work_days) > 1 else 0
+        avg_hours_per_day = _mean(work_days)
+        std_hours_per_day = _stdev(work_days, avg_hours_per_day)
     else:
         avg_hours_per_day = 0
         std_hours_per_day = 0
 
     # === DÉTECTION D'ANOMALIES ===
 
-    anomalies = []
+    # Un seul parcours des jours ; une liste par famille d'anomalies pour
+    # conserver l'ordre du rapport (bornes, statistiques, jours vides)
+    bound_anomalies = []
+    stat_anomalies = []
+    empty_day_anomalies = []
     incoherences = []
     gaps = []
+    weekly_pattern = defaultdict(list)
+
+    # Seuils à 2σ ; sans dispersion, aucun jour ne peut en sortir
+    if std_hours_per_day > 0:
+        lower_threshold = avg_hours_per_day - (2 * std_hours_per_day)
+        upper_threshold = avg_hours_per_day + (2 * std_hours_per_day)
+    else:
+        lower_threshold, upper_threshold = -math.inf, math.inf
+
+    from datetime import date as date_today
+
+    today = date_today.today()
+    fr_holidays = fr_holiday_dates(
+        tuple(range(int(from_date[:4]), int(to_date[:4]) + 1))
+    )
 
-    # 1. Détection d'heures impossibles
+    date_strs = {}
     for date, day_data in daily_work_data.items():
-        total_hours = day_data["total_hours"]
+        total_hours = day_data.total_hours
+        date_str = date_strs[date] = date.strftime("%d/%m/%Y")
 
+        # 1. Détection d'heures impossibles
         if total_hours > 24:
-            anomalies.append(
+            bound_anomalies.append(
                 {
                     "type": "heures_impossibles",
                     "severity": "error",
-                    "date": date.strftime("%d/%m/%Y"),
+                    "date": date_str,
                     "message": f"Jour avec {total_hours}h totales (impossible > 24h)",
                     "details": {
                         "heures_totales": total_hours,
-                        "clients": day_data["clients"],
+                        "clients": day_data.clients,
                     },
                 }
             )
 
         elif total_hours < 0:
-            anomalies.append(
+            bound_anomalies.append(
                 {
                     "type": "heures_negatives",
                     "severity": "error",
-                    "date": date.strftime("%d/%m/%Y"),
+                    "date": date_str,
                     "message": f"Jour avec {total_hours}h totales (impossible < 0h)",
                     "details": {
                         "heures_totales": total_hours,
-                        "clients": day_data["clients"],
+                        "clients": day_data.clients,
                     },
                 }
             )
 
-    # 2. Détection de jours suspects (basé sur les statistiques)
-    if std_hours_per_day > 0:
-        lower_threshold = avg_hours_per_day - (2 * std_hours_per_day)
-        upper_threshold = avg_hours_per_day + (2 * std_hours_per_day)
-
-        for date, day_data in daily_work_data.items():
-            total_hours = day_data["total_hours"]
-
-            if total_hours > 0:  # Ignorer les jours vides
+        if total_hours > 0:
+            # 2. Détection de jours suspects (basé sur les statistiques) ;
+            # une seule comparaison chaînée pour les jours dans la norme
+            if not lower_threshold <= total_hours <= upper_threshold:
                 if total_hours < lower_threshold:
-                    anomalies.append(
+                    stat_anomalies.append(
                         {
                             "type": "sous_activite",
                             "severity": "warning",
-                            "date": date.strftime("%d/%m/%Y"),
+                            "date": date_str,
                             "message": f"Jour avec {total_hours}h vs moyenne {avg_hours_per_day:.1f}h",
                             "details": {
                                 "heures": total_hours,
@@ -333,12 +778,12 @@ def analyze_data_intelligence(
                         }
                     )
 
-                elif total_hours > upper_threshold:
-                    anomalies.append(
+                else:
+                    stat_anomalies.append(
                         {
                             "type": "sur_activite",
                             "severity": "info",
-                            "date": date.strftime("%d/%m/%Y"),
+                            "date": date_str,
                             "message": f"Jour avec {total_hours}h vs moyenne {avg_hours_per_day:.1f}h",
                             "details": {
                                 "heures": total_hours,
@@ -349,101 +794,61 @@ def analyze_data_intelligence(
                         }
                     )
 
-    # 3. Détection de jours complètement vides (tous clients à 0h)
-    from datetime import date as date_today
-
-    for date, day_data in daily_work_data.items():
-        if day_data["total_hours"] == 0:
-            # Ignorer les jours dans le futur
-            if date.date() > date_today.today():
-                continue
-
-            # Vérifier si c'est un weekend ou jour férié
-            if date.weekday() >= 5:  # Weekend
-                continue
-            elif date in holidays.FR():  # Jour férié
-                continue
+            # Pattern hebdomadaire
+            weekly_pattern[date.strftime("%A")].append(total_hours)
+
+        # 3. Détection de jours complètement vides (tous clients à 0h), hors
+        # jours futurs, weekends, jours fériés et jours OFF déclarés
+        elif (
+            total_hours == 0
+            and date.date() <= today
+            and date.weekday() < 5
+            and date.date() not in fr_holidays
+            and not day_data.has_off_clients
+        ):
+            if len(day_data.clients) == 0:
+                # Vraiment aucun client - suspect
+                empty_day_anomalies.append(
+                    {
+                        "type": "jour_vide",
+                        "severity": "warning",
+                        "date": date_str,
+                        "message": "Jour de semaine sans aucune donnée client",
+                        "details": {
+                            "type_jour": "semaine",
+                            "clients": day_data.clients,
+                            "raison": "Aucun client configuré pour cette date",
+                        },
+                    }
+                )
             else:
-                # Vérifier si c'est un jour OFF déclaré ou vraiment vide
-                has_off_clients = any(
-                    client_data.get("all_off", False)
-                    for client_data in day_data["clients"].values()
+                # Clients configurés mais à 0h sans aucun OFF déclaré
+                empty_day_anomalies.append(
+                    {
+                        "type": "jour_suspect",
+                        "severity": "info",
+                        "date": date_str,
+                        "message": "Jour avec clients configurés mais 0h totales",
+                        "details": {
+                            "type_jour": "semaine",
+                            "clients": day_data.clients,
+                            "raison": "Vérifier si c'est normal ou oubli de saisie",
+                        },
+                    }
                 )
 
-                if has_off_clients:
-                    # Jour OFF déclaré - normal
-                    continue
-                elif len(day_data["clients"]) == 0:
-                    # Vraiment aucun client - suspect
-                    anomalies.append(
-                        {
-                            "type": "jour_vide",
-                            "severity": "warning",
-                            "date": date.strftime("%d/%m/%Y"),
-                            "message": "Jour de semaine sans aucune donnée client",
-                            "details": {
-                                "type_jour": "semaine",
-                                "clients": day_data["clients"],
-                                "raison": "Aucun client configuré pour cette date",
-                            },
-                        }
-                    )
-                else:
-                    # Clients configurés mais tous à 0h - vérifier si c'est normal
-                    all_clients_off = all(
-                        client_data.get("all_off", False)
-                        for client_data in day_data["clients"].values()
-                    )
-
-                    if not all_clients_off:
-                        # Certains clients devraient avoir des heures
-                        anomalies.append(
-                            {
-                                "type": "jour_suspect",
-                                "severity": "info",
-                                "date": date.strftime("%d/%m/%Y"),
-                                "message": "Jour avec clients configurés mais 0h totales",
-                                "details": {
-                                    "type_jour": "semaine",
-                                    "clients": day_data["clients"],
-                                    "raison": "Vérifier si c'est normal ou oubli de saisie",
-                                },
-                            }
-                        )
-
-    # 4. Détection de gaps temporels (périodes sans données)
-    dates_list = sorted(data.keys())
-    if len(dates_list) > 1:
-        for i in range(len(dates_list) - 1):
-            current_date = dates_list[i]
-            next_date = dates_list[i + 1]
-            expected_next = current_date + timedelta(days=1)
-
-            if next_date != expected_next:
-                gap_days = (next_date - current_date).days - 1
-                if gap_days > 0:
-                    gaps.append(
-                        {
-                            "debut": current_date.strftime("%d/%m/%Y"),
-                            "fin": next_date.strftime("%d/%m/%Y"),
-                            "duree": gap_days,
-                            "message": f"{gap_days} jour(s) sans données entre {current_date.strftime('%d/%m/%Y')} et {next_date.strftime('%d/%m/%Y')}",
-                        }
-                    )
-
-    # 5. Détection d'incohérences logiques
-    for date, day_data in daily_work_data.items():
-        for client, client_data in day_data["clients"].items():
+        # 5. Détection d'incohérences logiques
+        for client, client_data in day_data.clients.items():
             # Vérifier la cohérence des notes
-            notes = client_data["notes"]
-            hours = client_data["hours"]
+            notes = client_data.notes
+            hours = client_data.hours
 
             # Si OFF mais avec des notes détaillées
-            if client_data["all_off"] and any(len(note.strip()) > 3 for note in notes):
+            if client_data.all_off and any(len(note.strip()) > 3 for note in notes):
                 incoherences.append(
                     {
                         "type": "off_avec_notes",
-                        "date": date.strftime("%d/%m/%Y"),
+                        "date": date_str,
                         "client": client,
                         "message": f"Client {client} déclaré OFF mais avec notes détaillées",
                         "details": {"heures": hours, "notes": notes},
@@ -451,33 +856,45 @@ def analyze_data_intelligence(
                 )
 
             # Si demi-journée mais pas de note OFF
-            elif client_data["has_off"] and not any(
+            elif client_data.has_off and not any(
                 note.strip() == "OFF" for note in notes
             ):
                 incoherences.append(
                     {
                         "type": "demi_journee_sans_off",
-                        "date": date.strftime("%d/%m/%Y"),
+                        "date": date_str,
                         "client": client,
                         "message": f"Client {client} en demi-journée mais pas de note OFF",
                         "details": {"heures": hours, "notes": notes},
                     }
                 )
 
-    # === STATISTIQUES ET PATTERNS ===
+    anomalies = bound_anomalies + stat_anomalies + empty_day_anomalies
+    severity_counts = Counter(anomaly["severity"] for anomaly in anomalies)
 
-    # Pattern hebdomadaire
-    weekly_pattern = defaultdict(list)
-    for date, day_data in daily_work_data.items():
-        if day_data["total_hours"] > 0:
-            weekday = date.strftime("%A")
-            weekly_pattern[weekday].append(day_data["total_hours"])
+    # 4. Détection de gaps temporels (périodes sans données)
+    # Comparaison d'ordinaux entiers, sans arithmétique de timedelta
+    for current_date, next_date in pairwise(sorted(data)):
+        gap_days = next_date.toordinal() - current_date.toordinal() - 1
+        if gap_days > 0:
+            debut = date_strs[current_date]
+            fin = date_strs[next_date]
+            gaps.append(
+                {
+                    "debut": debut,
+                    "fin": fin,
+                    "duree": gap_days,
+                    "message": f"{gap_days} jour(s) sans données entre {debut} et {fin}",
+                }
+            )
+
+    # === STATISTIQUES ET PATTERNS ===
 
     weekly_stats = {}
     for day, hours_list in weekly_pattern.items():
         if hours_list:
             weekly_stats[day] = {
-                "moyenne": statistics.mean(hours_list),
+                "moyenne": _mean(hours_list),
                 "min": min(hours_list),
                 "max": max(hours_list),
                 "nb_jours": len(hours_list),
@@ -496,14 +913,14 @@ def analyze_data_intelligence(
         "anomalies": {
             "total": len(anomalies),
             "par_severite": {
-                "error": len([a for a in anomalies if a["severity"] == "error"]),
-                "warning": len([a for a in anomalies if a["severity"] == "warning"]),
-                "info": len([a for a in anomalies if a["severity"] == "info"]),
+                "error": severity_counts["error"],
+                "warning": severity_counts["warning"],
+                "info": severity_counts["info"],
             },
         },
     }
 
-    return {
+    result = {
         "summary": summary,
         "anomalies": anomalies,
         "incoherences": incoherences,
@@ -514,135 +931,143 @@ def analyze_data_intelligence(
                 "moyenne": avg_hours_per_day,
                 "ecart_type": std_hours_per_day,
                 "seuils": {
-                    "bas": (
-                        round(avg_hours_per_day - (2 * std_hours_per_day), 1)
-                        if std_hours_per_day > 0
-                        else 0
-                    ),
-                    "haut": (
-                        round(avg_hours_per_day + (2 * std_hours_per_day), 1)
-                        if std_hours_per_day > 0
-                        else 0
-                    ),
+                    "bas": (round(lower_threshold, 1) if std_hours_per_day > 0 else 0),
+                    "haut": (round(upper_threshold, 1) if std_hours_per_day > 0 else 0),
                 },
             },
         },
-        "donnees_jour": {
-            date.strftime("%d/%m/%Y"): {
-                "total_hours": day_data["total_hours"],
+    }
+
+    if include_daily:
+        result["donnees_jour"] = {
+            date_strs[date]: {
+                "total_hours": day_data.total_hours,
                 "clients": {
                     client: {
-                        "hours": client_data["hours"],
-                        "notes": client_data["notes"],
+                        "hours": client_data.hours,
+                        "notes": client_data.notes,
                     }
-                    for client, client_data in day_data["clients"].items()
+                    for client, client_data in day_data.clients.items()
                 },
             }
             for date, day_data in daily_work_data.items()
-        },
-    }
+        }
+
+    return result
+
+
+def filter_events(events: List[Dict], client_filter: Optional[List[str]]) -> List[Dict]:
+    """Ne garde que les événements des clients demandés (tous si pas de filtre)"""
+    if not client_filter:
+        return events
+    clients = frozenset(client_filter)
+    return [event for event in events if event_client_name(event) in clients]
+
+
+def build_excel_file(
+    report: TimelyReport, data: Dict[datetime, List]
+) -> Tuple[BinaryIO, int]:
+    """
+    Génère le fichier Excel dans un fichier temporaire prêt à être relu.
+
+    Retourne le fichier rembobiné et sa taille en octets.
+    """
+    output = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_SIZE)
+    report.generate_excel(data, output)
+    size = output.seek(0, os.SEEK_END)
+    output.seek(0)
+    return output, size
+
+
+def attachment_disposition(filename: str) -> str:
+    """En-tête Content-Disposition de téléchargement (RFC 6266 / RFC 5987)"""
+    return f"attachment; filename=\"{filename}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def iter_file_chunks(
+    file: BinaryIO, chunk_size: int = EXCEL_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Lit un fichier par blocs pour une StreamingResponse, puis le ferme"""
+    try:
+        while chunk := file.read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
 
 
 @app.post("/generate-report")
 async def generate_report(request: ReportRequest):
     """Génère un rapport pour la période donnée au format Excel ou JSON"""
+    validate_period(request.from_date, request.to_date)
     try:
         report = TimelyReport(TIMELY_ACCOUNT_ID, API_URL)
         # Récupérer tous les événements
-        events = await report.get_events(request.from_date, request.to_date)
-        # Filtrer pour ne garder que les événements des clients spécifiés
-        filtered_events = (
-            [
-                e
-                for e in events
-                if (
-                    e.get("project", {}).get("client", {}).get("name", "")
-                    in request.client_filter
-                )
-            ]
-            if request.client_filter
-            else events
+        events = await timely_client.get_all_events(
+            TIMELY_ACCOUNT_ID, request.from_date, request.to_date
         )
-        # Traiter les événements filtrés
-        data = report.process_events(
-            filtered_events, request.from_date, request.to_date
+        # Filtrer pour ne garder que les événements des clients spécifiés
+        filtered_events = filter_events(events, request.client_filter)
+        # Traiter les événements filtrés (hors de la boucle d'événements)
+        data = await anyio.to_thread.run_sync(
+            report.process_events, filtered_events, request.from_date, request.to_date
         )
 
         if request.format == "json":
             # Transformer les données au format attendu par le frontend
             formatted_data = []
             for date, entries in sorted(data.items()):
-                if not entries:
-                    formatted_data.append(
-                        {
-                            "date": date.strftime("%d/%m/%Y"),
-                            "client": "",
-                            "duration": "0",
-                            "description": "",
-                            "type": "empty",
-                        }
-                    )
-                elif entries[0][1] in ["WEEKEND", "HOLIDAY"]:
-                    formatted_data.append(
-                        {
-                            "date": date.strftime("%d/%m/%Y"),
-                            "client": "",
-                            "duration": "0",
-                            "description": entries[0][1],
-                            "type": entries[0][1].lower(),
-                        }
-                    )
-                else:
-                    # Grouper les entrées par client
-                    entries_by_client = {}
-                    for prefix, note in entries:
-                        client = prefix.strip("[]") if prefix else ""
-                        if client not in entries_by_client:
-                            entries_by_client[client] = []
-                        entries_by_client[client].append(note)
-
-                    # Calculer la durée totale et créer la description
-                    total_duration = 0
+                day_clients, duration, description, day_type = "", "0", "", "empty"
+
+                if entries and entries[0][1] in ("WEEKEND", "HOLIDAY"):
+                    description = entries[0][1]
+                    day_type = description.lower()
+                elif entries:
+                    total_duration, clients_by_name = summarize_day(entries)
                     descriptions = []
                     clients = []
-                    separator = "\n\n― ― ― ― ― ― ― ― ― ―\n\n"
-
-                    for client, client_entries in entries_by_client.items():
-                        # Vérifier si c'est un jour OFF pour ce client
-                        all_off = all(note.strip() == "OFF" for note in client_entries)
-                        has_off = any(note.strip() == "OFF" for note in client_entries)
-                        # Trier les entrées du client (sort() modifie la liste en place)
-                        client_entries.sort()
-                        duration = 0 if all_off else 0.5 if has_off else 1
-                        total_duration += duration
-
-                        if duration > 0:
+
+                    for client, day in clients_by_name.items():
+                        all_off, has_off = day.all_off, day.has_off
+                        # Seuls les clients facturés apparaissent : inutile de
+                        # trier les notes des autres
+                        if day.hours > 0:
                             clients.append(client)
-                            descriptions.append("\n\n".join(client_entries))
+                            descriptions.append("\n\n".join(sorted(day.notes)))
 
-                    formatted_data.append(
-                        {
-                            "date": date.strftime("%d/%m/%Y"),
-                            "client": " + ".join(clients),
-                            "duration": total_duration,
-                            "description": separator.join(descriptions),
-                            "type": (
-                                "off" if all_off else "half_off" if has_off else "work"
-                            ),
-                        }
-                    )
-            return JSONResponse(content=formatted_data)
+                    day_clients = " + ".join(clients)
+                    duration = total_duration
+                    description = CLIENT_SEPARATOR.join(descriptions)
+                    day_type = "off" if all_off else "half_off" if has_off else "work"
+
+                formatted_data.append(
+                    {
+                        "date": date.strftime("%d/%m/%Y"),
+                        "client": day_clients,
+                        "duration": duration,
+                        "description": description,
+                        "type": day_type,
+                    }
+                )
+            return ORJSONResponse(
+                content=formatted_data,
+                headers={
+                    "Cache-Control": "private, max-age=60",
+                    "Vary": "Authorization",
+                },
+            )
+
+        # Nom du fichier : imputations_<mois>_<année sur 2 chiffres>.xlsx
+        filename = f"imputations_{request.from_date[5:7]}_{request.from_date[2:4]}.xlsx"
 
-        output = BytesIO()
-        report.generate_excel(data, output)
-        output.seek(0)
+        # openpyxl est synchrone : la génération ne doit pas bloquer la boucle
+        output, size = await anyio.to_thread.run_sync(build_excel_file, report, data)
 
         return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            iter_file_chunks(output),
+            media_type=XLSX_MEDIA_TYPE,
             headers={
-                "Content-Disposition": f"attachment; filename=imputations_"
-                f"{request.from_date[5:7].lower()}_{request.from_date[2:4]}.xlsx"
+                "Content-Disposition": attachment_disposition(filename),
+                "Content-Length": str(size),
             },
         )
     except Exception as e:
@@ -653,31 +1078,9 @@ async def generate_report(request: ReportRequest):
 
 @app.get("/health")
 async def health_check():
-    return JSONResponse(content={"status": "OK"}, status_code=200)
-
-
-class LLMAnalysisRequest(BaseModel):
-    from_date: str
-    to_date: str
-    client_filter: Optional[List[str]] = None
-    analysis_data: dict  # Résultat de l'analyse existante
-
-
-class LLMInsight(BaseModel):
-    category: str
-    title: str
-    description: str
-    impact: str  # "high", "medium", "low"
-    recommendation: str
-    confidence: float  # 0.0 à 1.0
-
-
-class LLMAnalysisResponse(BaseModel):
-    summary: str
-    insights: List[LLMInsight]
-    business_recommendations: List[str]
-    coherence_score: float
-    risk_alerts: List[str]
+    return ORJSONResponse(
+        content={"status": "OK"}, status_code=200, headers={"Cache-Control": "no-store"}
+    )
 
 
 @app.post("/analyze-with-llm")
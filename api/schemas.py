@@ -0,0 +1,62 @@
+"""
+Modèles de données de l'API : requêtes/réponses des endpoints et
+structure des événements Timely utilisés pour les rapports.
+"""
+
+from typing import List, Optional, TypedDict
+from pydantic import BaseModel
+
+
+class TimelyClientRef(TypedDict, total=False):
+    name: Optional[str]
+
+
+class TimelyProjectRef(TypedDict, total=False):
+    name: Optional[str]
+    client: Optional[TimelyClientRef]
+
+
+class TimelyEvent(TypedDict, total=False):
+    """Champs d'un événement Timely utilisés pour les rapports"""
+
+    day: str
+    note: Optional[str]
+    project: Optional[TimelyProjectRef]
+
+
+class ReportRequest(BaseModel):
+    from_date: str
+    to_date: str
+    format: str = "excel"  # "excel" ou "json"
+    client_filter: List[str] | None = None
+
+
+class DataAnalysisRequest(BaseModel):
+    from_date: str
+    to_date: str
+    client_filter: List[str] | None = None
+    include_daily: bool = False  # inclure donnees_jour dans la réponse
+
+
+class LLMAnalysisRequest(BaseModel):
+    from_date: str
+    to_date: str
+    client_filter: Optional[List[str]] = None
+    analysis_data: dict  # Résultat de l'analyse existante
+
+
+class LLMInsight(BaseModel):
+    category: str
+    title: str
+    description: str
+    impact: str  # "high", "medium", "low"
+    recommendation: str
+    confidence: float  # 0.0 à 1.0
+
+
+class LLMAnalysisResponse(BaseModel):
+    summary: str
+    insights: List[LLMInsight]
+    business_recommendations: List[str]
+    coherence_score: float
+    risk_alerts: List[str]
@@ -3,22 +3,163 @@ Script de génération de rapports d'activité à partir des événements Timely
 Génère un fichier Excel formaté selon les besoins spécifiques.
 """
 
+from calendar import monthrange
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from xml.sax.saxutils import escape
 import httpx
 import asyncio
 import os
+import re
+import zipfile
 from dotenv import load_dotenv
 import openpyxl
-from typing import Dict, List, Tuple, Union
+import orjson
+import lxml  # noqa: F401  (openpyxl écrit le XML en flux via lxml)
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 import holidays
 
 # Configuration
 load_dotenv()
 TIMELY_ACCOUNT_ID = os.getenv("TIMELY_ACCOUNT_ID")
 API_BASE_URL = "http://localhost:8000"
-
-# Initialisation des jours fériés français
-fr_holidays = holidays.FR()
+PAGE_BATCH_SIZE = 4  # pages d'événements demandées en parallèle
+
+
+# Parties fixes d'un classeur .xlsx d'une seule feuille (generate_excel_fast)
+_XLSX_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XLSX_CT = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": _XML_DECLARATION
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    + '<Default Extension="rels" '
+    + 'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    + '<Default Extension="xml" ContentType="application/xml"/>'
+    + f'<Override PartName="/xl/workbook.xml" ContentType="{_XLSX_CT}.sheet.main+xml"/>'
+    + '<Override PartName="/xl/worksheets/sheet1.xml" '
+    + f'ContentType="{_XLSX_CT}.worksheet+xml"/>'
+    + f'<Override PartName="/xl/styles.xml" ContentType="{_XLSX_CT}.styles+xml"/>'
+    + "</Types>",
+    "_rels/.rels": _XML_DECLARATION
+    + f'<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/officeDocument" '
+    + 'Target="xl/workbook.xml"/>'
+    + "</Relationships>",
+    "xl/workbook.xml": _XML_DECLARATION
+    + f'<workbook xmlns="{_XLSX_MAIN_NS}" xmlns:r="{_XLSX_REL_NS}">'
+    + '<sheets><sheet name="Sheet" sheetId="1" r:id="rId1"/></sheets>'
+    + "</workbook>",
+    "xl/_rels/workbook.xml.rels": _XML_DECLARATION
+    + f'<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/worksheet" '
+    + 'Target="worksheets/sheet1.xml"/>'
+    + f'<Relationship Id="rId2" Type="{_XLSX_REL_NS}/styles" Target="styles.xml"/>'
+    + "</Relationships>",
+    "xl/styles.xml": _XML_DECLARATION
+    + f'<styleSheet xmlns="{_XLSX_MAIN_NS}">'
+    + '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    + '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    + '<fill><patternFill patternType="gray125"/></fill></fills>'
+    + '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/>'
+    + "</border></borders>"
+    + '<cellStyleXfs count="1">'
+    + '<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    + '<cellXfs count="1">'
+    + '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    + '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/>'
+    + "</cellStyles>"
+    + "</styleSheet>",
+}
+_XLSX_SHEET_HEADER = (
+    _XML_DECLARATION + f'<worksheet xmlns="{_XLSX_MAIN_NS}"><sheetData>'
+).encode()
+_XLSX_SHEET_FOOTER = b"</sheetData></worksheet>"
+# Caractères de contrôle interdits en XML 1.0 (openpyxl les refuse aussi)
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_row(index: int, values: Tuple[str, ...]) -> str:
+    """Ligne de sheet1.xml en chaînes inline ; les cellules vides sont omises"""
+    cells = "".join(
+        f'<c r="{column}{index}" t="inlineStr"><is><t xml:space="preserve">'
+        f'{escape(_ILLEGAL_XML_CHARS.sub("", value))}</t></is></c>'
+        for column, value in zip("ABCDE", values)
+        if value
+    )
+    return f'<row r="{index}">{cells}</row>'
+
+
+def event_client_name(event: Dict) -> str:
+    """Nom du client d'un événement Timely ("" si absent)"""
+    try:
+        return event["project"]["client"]["name"]
+    except (KeyError, TypeError):
+        return ""
+
+
+def _event_project_name(event: Dict) -> str:
+    """Nom du projet d'un événement Timely ("" si absent)"""
+    try:
+        return event["project"]["name"]
+    except (KeyError, TypeError):
+        return ""
+
+
+@lru_cache(maxsize=4096)
+def _parse_ymd(day: str) -> datetime:
+    """Date "YYYY-MM-DD" d'un événement (mise en cache : peu de jours distincts)"""
+    year, month, day_of_month = day.split("-")
+    return datetime(int(year), int(month), int(day_of_month))
+
+
+@lru_cache(maxsize=8)
+def fr_holiday_dates(years: Tuple[int, ...]) -> frozenset:
+    """Jours fériés français des années données (calculés une seule fois)"""
+    return frozenset(holidays.FR(years=years).keys())
+
+
+@dataclass(slots=True)
+class ClientDay:
+    """Agrégat des notes d'un client sur une journée"""
+
+    hours: float
+    notes: List[str]
+    all_off: bool
+    has_off: bool
+
+
+def summarize_day(
+    entries: List[Tuple[str, str]],
+) -> Tuple[float, Dict[str, ClientDay]]:
+    """
+    Regroupe les entrées d'une journée par client.
+
+    Retourne le total d'heures du jour et, par client, ses notes et sa durée
+    (0 si toutes ses notes sont OFF, 0.5 si au moins une l'est, 1 sinon).
+    """
+    clients: Dict[str, ClientDay] = {}
+    for prefix, note in entries:
+        # Le préfixe est de la forme "[client]" (vide pour weekends et fériés)
+        client = prefix[1:-1] if prefix[:1] == "[" else prefix
+        day = clients.get(client)
+        if day is None:
+            day = clients[client] = ClientDay(0, [], True, False)
+        is_off = note.strip() == "OFF"
+        day.notes.append(note)
+        day.all_off &= is_off
+        day.has_off |= is_off
+
+    total_hours = 0
+    for day in clients.values():
+        day.hours = 0 if day.all_off else 0.5 if day.has_off else 1
+        total_hours += day.hours
+    return total_hours, clients
 
 
 class TimelyReport:
@@ -27,44 +168,74 @@ class TimelyReport:
     def __init__(self, account_id: str, api_url: str):
         self.account_id = account_id
         self.api_url = api_url
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "TimelyReport":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé, créé au premier appel (keep-alive entre rapports)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(
+                    max_keepalive_connections=PAGE_BATCH_SIZE,
+                    max_connections=PAGE_BATCH_SIZE,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Ferme le client HTTP partagé"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def get_events(self, from_date: str, to_date: str) -> List[Dict]:
-        """Récupère tous les événements pour une période donnée"""
-        async with httpx.AsyncClient() as client:
-            all_events = []
-            page = 1
-
-            while True:
-                response = await client.get(
-                    f"{self.api_url}/{self.account_id}/events",
-                    params={
-                        "since": from_date,
-                        "upto": to_date,
-                        "page": page,
-                        "per_page": 250,
-                    },
+        """
+        Récupère tous les événements pour une période donnée.
+
+        Les pages sont demandées par lots de PAGE_BATCH_SIZE en parallèle ; la
+        première page vide marque la fin des événements.
+        """
+        all_events = []
+        page = 1
+
+        while True:
+            batch = await asyncio.gather(
+                *(
+                    self._get_page(from_date, to_date, batch_page)
+                    for batch_page in range(page, page + PAGE_BATCH_SIZE)
                 )
-                events = response.json()
+            )
+            for events in batch:
                 if not events:
-                    break
-
+                    return all_events
                 all_events.extend(events)
-                page += 1
-
-            return all_events
+            page += PAGE_BATCH_SIZE
+
+    async def _get_page(self, from_date: str, to_date: str, page: int) -> List[Dict]:
+        """Récupère une page d'événements"""
+        response = await self._get_client().get(
+            f"{self.api_url}/{self.account_id}/events",
+            params={
+                "since": from_date,
+                "upto": to_date,
+                "page": page,
+                "per_page": 250,
+            },
+        )
+        return orjson.loads(response.content)
 
     def filter_events_by_client(
         self, events: List[Dict], client_name: str
     ) -> List[Dict]:
         """Filtre les événements pour ne garder que ceux du client spécifié"""
-        return [
-            event
-            for event in events
-            if (
-                event.get("project", {}).get("client", {}).get("name", "")
-                == client_name
-            )
-        ]
+        return [event for event in events if event_client_name(event) == client_name]
 
     @staticmethod
     def _is_weekend(date: datetime) -> bool:
@@ -72,9 +243,9 @@ class TimelyReport:
         return date.weekday() >= 5
 
     @staticmethod
-    def _is_holiday(date: datetime) -> bool:
+    def _is_holiday(date: datetime, holiday_dates: frozenset) -> bool:
         """Vérifie si une date est un jour férié"""
-        return date in fr_holidays
+        return date.date() in holiday_dates
 
     @staticmethod
     def _get_dates_range(from_date: str, to_date: str) -> List[datetime]:
@@ -89,131 +260,133 @@ class TimelyReport:
     ) -> Dict[datetime, List[Tuple[str, str]]]:
         """Traite les événements et les organise par date"""
         data_by_date = {}
+        working_days = set()
 
-        # Initialiser toutes les dates
-        for date in self._get_dates_range(from_date, to_date):
+        dates = self._get_dates_range(from_date, to_date)
+        holiday_dates = fr_holiday_dates(
+            tuple(range(dates[0].year, dates[-1].year + 1)) if dates else ()
+        )
+
+        # Initialiser toutes les dates (weekend / férié évalué une seule fois)
+        for date in dates:
             if self._is_weekend(date):
                 data_by_date[date] = [("", "WEEKEND")]
-            elif self._is_holiday(date):
+            elif self._is_holiday(date, holiday_dates):
                 data_by_date[date] = [("", "HOLIDAY")]
             else:
                 data_by_date[date] = []
+                working_days.add(date)
 
         # Grouper les événements par date et par client
-        events_by_date = {}
+        events_by_date = defaultdict(lambda: defaultdict(list))
         for event in events:
-            date = datetime.strptime(event["day"], "%Y-%m-%d")
-            if not (self._is_weekend(date) or self._is_holiday(date)):
-                project = event.get("project", {})
-                project_name = project.get("name", "")
-                client_name = project.get("client", {}).get("name", "")
-
-                if date not in events_by_date:
-                    events_by_date[date] = {}
-
-                if client_name not in events_by_date[date]:
-                    events_by_date[date][client_name] = []
+            date = _parse_ymd(event["day"])
+            if date in working_days:
+                project_name = _event_project_name(event)
+                client_name = event_client_name(event)
 
                 # Pas de préfixe pour Management
                 if project_name == "Management":
-                    prefix = f"[{client_name}]"
                     note = event.get("note", "")
                 else:
-                    prefix = f"[{client_name}]"
                     note = f"[{project_name}] {event.get('note', '')}"
 
-                events_by_date[date][client_name].append((prefix, note))
+                events_by_date[date][client_name].append((f"[{client_name}]", note))
 
         # Convertir en format final
-        for date in self._get_dates_range(from_date, to_date):
-            if not (self._is_weekend(date) or self._is_holiday(date)):
-                if date in events_by_date:
-                    data_by_date[date] = []
-                    for client_events in events_by_date[date].values():
-                        data_by_date[date].extend(client_events)
+        for date, events_by_client in events_by_date.items():
+            data_by_date[date] = list(chain.from_iterable(events_by_client.values()))
 
         return data_by_date
 
     def generate_excel(
-        self, data_by_date: Dict[datetime, List[Tuple[str, str]]], output_path: str
+        self,
+        data_by_date: Dict[datetime, List[Tuple[str, str]]],
+        output: Union[str, BinaryIO],
     ):
-        """Génère le fichier Excel à partir des données traitées"""
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        row_index = 1
+        """
+        Génère le fichier Excel à partir des données traitées.
+
+        Le classeur est créé en mode write-only : les lignes sont sérialisées
+        au fil de l'eau au lieu d'être conservées sous forme de cellules.
+        data_by_date est consommé : chaque jour est retiré une fois écrit.
+        """
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+
+        append = sheet.append
+        for row in self._iter_rows(data_by_date):
+            append(row)
 
-        for date, entries in sorted(data_by_date.items()):
+        workbook.save(output)
+
+    def generate_excel_fast(
+        self,
+        data_by_date: Dict[datetime, List[Tuple[str, str]]],
+        output: Union[str, BinaryIO],
+    ):
+        """
+        Variante de generate_excel qui écrit directement le XML du classeur.
+
+        Même contenu (une feuille de cinq colonnes de texte), sans le modèle de
+        cellules d'openpyxl : les lignes sont écrites en chaînes inline dans
+        sheet1.xml, les autres parties du paquet sont constantes.
+        data_by_date est consommé comme pour generate_excel.
+        """
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in _XLSX_STATIC_PARTS.items():
+                archive.writestr(name, content)
+            with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                write = sheet.write
+                write(_XLSX_SHEET_HEADER)
+                for index, row in enumerate(self._iter_rows(data_by_date), start=1):
+                    write(_xlsx_row(index, row).encode())
+                write(_XLSX_SHEET_FOOTER)
+
+    def _iter_rows(
+        self, data_by_date: Dict[datetime, List[Tuple[str, str]]]
+    ) -> Iterator[Tuple[str, str, str, str, str]]:
+        """Lignes du rapport par date croissante (consomme data_by_date)"""
+        build_row = self._build_row
+        pop_day = data_by_date.pop
+        for date in sorted(data_by_date):
+            entries = pop_day(date)
+            # Une seule mise en forme par date, partagée par ses lignes clients
+            date_str = date.strftime("%d/%m/%Y")
             if not entries:
-                self._write_row(sheet, row_index, date, [], "")
-                row_index += 1
+                yield build_row(date_str, [], "")
             elif isinstance(entries[0], tuple):
-                # Grouper les entrées par client
-                entries_by_client = {}
-                for prefix, note in entries:
-                    client = prefix.strip("[]") if prefix else ""
-                    if client not in entries_by_client:
-                        entries_by_client[client] = []
-                    entries_by_client[client].append(note)
-
                 # Écrire une ligne par client
-                for client, client_entries in sorted(entries_by_client.items()):
-                    # Vérifier si c'est un jour OFF pour ce client
-                    all_off = all(note.strip() == "OFF" for note in client_entries)
-                    has_off = any(note.strip() == "OFF" for note in client_entries)
-
-                    self._write_row(
-                        sheet,
-                        row_index,
-                        date,
-                        client_entries,
+                _, clients = summarize_day(entries)
+                for client, day in sorted(clients.items()):
+                    yield build_row(
+                        date_str,
+                        day.notes,
                         client,
-                        all_off=all_off,
-                        has_off=has_off,
+                        all_off=day.all_off,
+                        has_off=day.has_off,
                     )
-                    row_index += 1
             else:
                 # C'est un weekend ou un jour férié
-                self._write_row(sheet, row_index, date, [entries[0][1]], "")
-                row_index += 1
+                yield build_row(date_str, [entries[0][1]], "")
 
-        workbook.save(output_path)
-
-    def _write_row(
-        self,
-        sheet,
-        row: int,
-        date: datetime,
-        entries: List[Union[str, Tuple[str, str]]],
+    @staticmethod
+    def _build_row(
+        date_str: str,
+        notes: List[str],
         client: str,
         all_off: bool = False,
         has_off: bool = False,
-    ):
-        """Écrit une ligne dans le fichier Excel"""
-        # Remplir les cellules
-        sheet.cell(row=row, column=1, value=date.strftime("%d/%m/%Y"))
-
-        if not entries:
-            time, location = "0", ""
-        elif isinstance(entries[0], str) and entries[0] in ["WEEKEND", "HOLIDAY"]:
+    ) -> Tuple[str, str, str, str, str]:
+        """Construit une ligne de la feuille Excel"""
+        if not notes or notes[0] in ("WEEKEND", "HOLIDAY"):
             time, location = "0", ""
         else:
             time = "0" if all_off else "0.5" if has_off else "1"
             location = "Remote" if time != "0" else ""
 
-        sheet.cell(row=row, column=2, value=time)
-        sheet.cell(row=row, column=3, value=client)
-        sheet.cell(row=row, column=4, value=location)
-
-        # Traiter les notes en fonction de leur type
-        notes = []
-        for entry in entries:
-            if isinstance(entry, tuple):
-                _, note = entry
-                notes.append(note)
-            else:
-                notes.append(entry)
-
-        sheet.cell(row=row, column=5, value="\n\n".join(notes))
+        # Un seul join directement sur les notes, sans copie intermédiaire
+        return (date_str, time, client, location, "\n\n".join(notes))
 
 
 async def main():
@@ -221,18 +394,12 @@ async def main():
     # Calculer la période (mois courant)
     today = datetime.now()
     from_date = today.replace(day=1).strftime("%Y-%m-%d")
-    to_date = (
-        today.replace(
-            day=1,
-            month=today.month + 1 if today.month < 12 else 1,
-            year=today.year if today.month < 12 else today.year + 1,
-        )
-        - timedelta(days=1)
-    ).strftime("%Y-%m-%d")
+    last_day = monthrange(today.year, today.month)[1]
+    to_date = today.replace(day=last_day).strftime("%Y-%m-%d")
 
     # Générer le rapport
-    report = TimelyReport(TIMELY_ACCOUNT_ID, API_BASE_URL)
-    events = await report.get_events(from_date, to_date)
+    async with TimelyReport(TIMELY_ACCOUNT_ID, API_BASE_URL) as report:
+        events = await report.get_events(from_date, to_date)
     data = report.process_events(events, from_date, to_date)
     report.generate_excel(data, "./imputations.xlsx")
     print(f"Rapport généré pour la période du {from_date} au {to_date}")
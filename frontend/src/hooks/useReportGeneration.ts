@@ -21,6 +21,7 @@ export interface DataAnalysisRequest {
   from_date: string;
   to_date: string;
   client_filter: string[];
+  include_daily?: boolean;
 }
 
 export interface Anomaly {
@@ -90,7 +91,7 @@ export interface DataAnalysisResult {
       };
     };
   };
-  donnees_jour: Record<string, any>;
+  donnees_jour?: Record<string, any>; // présent seulement si include_daily
 }
 
 export interface LLMInsight {
@@ -229,7 +230,8 @@ export const useDataAnalysis = (
     queryFn: () => analyzeData({
       from_date: startDate!.format('YYYY-MM-DD'),
       to_date: endDate!.format('YYYY-MM-DD'),
-      client_filter: selectedClients
+      client_filter: selectedClients,
+      include_daily: true // le détail jour par jour alimente l'analyse LLM
     }),
     enabled: enabled && !!startDate && !!endDate && selectedClients.length > 0,
     staleTime: 5 * 60 * 1000, // 5 minutes - l'analyse change peu
@@ -1,26 +1,45 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 import openpyxl
+import lxml  # noqa: F401  (openpyxl écrit le XML en flux via lxml)
 
 input_file_path = "./export2.xlsx"
+# Projets dont les notes sont préfixées, avec leur préfixe déjà formaté
+PROJECT_PREFIXES = {"CI": "[CI]", "DevOps": "[DevOps]"}
 
-workbook = openpyxl.load_workbook(input_file_path)
+
+@lru_cache(maxsize=None)
+def parse_dmy(value):
+    """Date "JJ/MM/AAAA" (mise en cache : une même date revient sur plusieurs lignes)"""
+    day, month, year = value.split("/")
+    return datetime(int(year), int(month), int(day))
+
+
+# Lecture en flux : pas de graphe de cellules, formules remplacées par leur valeur
+workbook = openpyxl.load_workbook(input_file_path, read_only=True, data_only=True)
 sheet = workbook.active
 
 new_workbook = openpyxl.Workbook()
 new_sheet = new_workbook.active
 
-print(f"Number of rows: {sheet.max_row}")
 data_by_date = {}
+row_count = 1  # ligne d'en-tête
 
-for row in sheet.iter_rows(min_row=2, values_only=True):
+# max_col complète les lignes courtes ; sans <dimension>, max_row vaudrait None
+for row in sheet.iter_rows(min_row=2, max_col=5, values_only=True):
+    row_count += 1
     client, project, hour_date, hour_tags, hour_note = row
     if hour_date and hour_note:
-        date_obj = datetime.strptime(hour_date, "%d/%m/%Y")
+        date_obj = parse_dmy(hour_date)
         if date_obj not in data_by_date:
             data_by_date[date_obj] = []
-        prefix = f"[{project}]" if project in ["CI", "DevOps"] else ""
+        prefix = PROJECT_PREFIXES.get(project, "")
         data_by_date[date_obj].append((prefix, hour_note))
 
+# Le mode lecture seule garde le fichier ouvert jusqu'à la fermeture
+workbook.close()
+print(f"Number of rows: {row_count}")
+
 sorted_dates = sorted(data_by_date.keys())
 
 # Ajouter des dates manquantes
@@ -35,42 +54,30 @@ if sorted_dates:
 
 sorted_dates = sorted(data_by_date.keys())
 
-for index, date in enumerate(sorted_dates, start=1):
+append_row = new_sheet.append
+for date in sorted_dates:
     notes = []
-    for prefix, note in data_by_date[date]:
-        note_lines = note.split("\n")
-        note_lines[0] = f"{prefix} {note_lines[0]}" if prefix else f"{note_lines[0]}"
-        note = "\n".join(note_lines)
+    has_off = False  # relevé pendant la construction des notes
+    # Chaque jour est libéré dès que sa ligne est écrite
+    for prefix, note in data_by_date.pop(date):
+        # Le préfixe précède la première ligne : inutile de découper la note
+        if prefix:
+            note = f"{prefix} {note}"
         notes.append(note)
+        has_off = has_off or note == "OFF"
     cell_value = "\n\n".join(notes)
-    cell_date = new_sheet.cell(row=index, column=1)
-    cell_time = new_sheet.cell(row=index, column=2)
-    cell_client = new_sheet.cell(row=index, column=3)
-    cell_location = new_sheet.cell(row=index, column=4)
-    cell_tasks = new_sheet.cell(row=index, column=5)
-
-    cell_date.value = date.strftime("%d/%m/%Y")
     if notes:
         if len(notes) == 1 and notes[0].strip() == "OFF":
-            cell_time.value = "0"
-            cell_client.value = ""
-            cell_location.value = ""
-            cell_tasks.value = cell_value
-        elif "OFF" in notes:
-            cell_time.value = "0.5"
-            cell_client.value = "Pasqal"
-            cell_location.value = "Remote"
-            cell_tasks.value = cell_value
+            time, client, location = "0", "", ""
+        elif has_off:
+            time, client, location = "0.5", "Pasqal", "Remote"
         else:
-            cell_time.value = "1"
-            cell_client.value = "Pasqal"
-            cell_location.value = "Remote"
-            cell_tasks.value = cell_value
+            time, client, location = "1", "Pasqal", "Remote"
     else:
-        cell_time.value = "0"
-        cell_client.value = ""
-        cell_location.value = ""
-        cell_tasks.value = ""
+        time, client, location = "0", "", ""
+
+    # Une seule opération par ligne plutôt que cinq accès cell()
+    append_row([date.strftime("%d/%m/%Y"), time, client, location, cell_value])
 
 print(f"Number of rows: {len(sorted_dates)}")
 